@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Start Playwright's Chromium in the background with remote debugging enabled, so that
+submit_readings.py --cdp-url http://localhost:9222 connects to it instead of launching
+a browser on every run. The browser keeps running after this script exits.
+Run: python belssb_browser_up.py [--port 9222] [--headed]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from playwright.sync_api import sync_playwright
+
+from submit_readings import CHROMIUM_ARGS
+
+DEFAULT_PORT = 9222
+DEFAULT_USER_DATA_DIR = os.path.join(tempfile.gettempdir(), "belssb-cdp")
+STARTUP_TIMEOUT_S = 15
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Start a Chromium for submit_readings.py --cdp-url."
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Remote debugging port (default: {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "--user-data-dir",
+        default=DEFAULT_USER_DATA_DIR,
+        help=f"Chromium profile directory (default: {DEFAULT_USER_DATA_DIR})",
+    )
+    parser.add_argument(
+        "--headed",
+        action="store_true",
+        help="Run browser in headed mode (visible window).",
+    )
+    return parser.parse_args()
+
+
+def wait_until_up(cdp_url):
+    """Poll the DevTools version endpoint. Returns True once the browser answers."""
+    deadline = time.monotonic() + STARTUP_TIMEOUT_S
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{cdp_url}/json/version", timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def main():
+    args = parse_args()
+    cdp_url = f"http://localhost:{args.port}"
+    with sync_playwright() as p:
+        executable = p.chromium.executable_path
+    cmd = [
+        executable,
+        f"--remote-debugging-port={args.port}",
+        f"--user-data-dir={args.user_data_dir}",
+        "--no-first-run",
+        "--no-default-browser-check",
+        *CHROMIUM_ARGS,
+    ]
+    if not args.headed:
+        cmd.append("--headless=new")
+    subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,  # keep running after this script exits
+    )
+    if not wait_until_up(cdp_url):
+        print(f"Error: Chromium did not open {cdp_url} within {STARTUP_TIMEOUT_S}s.", file=sys.stderr)
+        return 1
+    print(cdp_url)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Long-lived helper for submit_readings.py: starts the Playwright driver and Chromium once
+and serves submissions over a Unix socket, so each CLI run only pays for a new browser
+context instead of a driver fork and browser launch. Concurrent requests run in parallel
+contexts of the same browser.
+
+Protocol: one JSON line per connection with the run_submit keyword arguments
+(account, tariff, day, night, peak, email, phone, debug); the reply is one JSON line
+{"success": bool, "message": str}.
+Run: python belssb_daemon.py [--socket PATH] [--headed]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+
+from submit_readings import (
+    BATCH_CONCURRENCY,
+    CHROMIUM_ARGS,
+    DEFAULT_SOCKET_PATH,
+    submit_with_browser,
+)
+
+
+class SubmitServer:
+    """Shared browser plus the per-connection request handler."""
+
+    def __init__(self, playwright, headed):
+        self.playwright = playwright
+        self.headed = headed
+        self.browser = None
+        self._launch_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def get_browser(self):
+        """Return the shared browser, relaunching it if it crashed or was closed."""
+        async with self._launch_lock:
+            if self.browser is None or not self.browser.is_connected():
+                self.browser = await self.playwright.chromium.launch(
+                    headless=not self.headed, args=list(CHROMIUM_ARGS)
+                )
+            return self.browser
+
+    async def handle(self, reader, writer):
+        """Handle one submission request in a fresh context of the shared browser."""
+        try:
+            reading = json.loads(await reader.readline())
+            async with self._semaphore:
+                success, message = await submit_with_browser(await self.get_browser(), **reading)
+        except PlaywrightTimeout as e:
+            success, message = False, f"Timeout while loading or submitting the form. ({e})"
+        except Exception as e:
+            success, message = False, str(e)
+        response = {"success": success, "message": message}
+        try:
+            writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Keep a browser running for fast submit_readings.py runs."
+    )
+    parser.add_argument(
+        "--socket",
+        default=os.environ.get("BELSSB_SOCKET", DEFAULT_SOCKET_PATH),
+        help=f"Unix socket path to listen on (default: {DEFAULT_SOCKET_PATH})",
+    )
+    parser.add_argument(
+        "--headed",
+        action="store_true",
+        help="Run browser in headed mode (visible window).",
+    )
+    return parser.parse_args()
+
+
+async def serve(socket_path, headed):
+    async with async_playwright() as p:
+        server = SubmitServer(p, headed)
+        await server.get_browser()
+        old_umask = os.umask(0o077)  # readings and contacts are personal: owner-only socket
+        try:
+            listener = await asyncio.start_unix_server(server.handle, path=socket_path)
+        finally:
+            os.umask(old_umask)
+        print(f"Listening on {socket_path}", file=sys.stderr)
+        try:
+            async with listener:
+                await listener.serve_forever()
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            if server.browser is not None:
+                await server.browser.close()
+
+
+def main():
+    args = parse_args()
+    os.makedirs(os.path.dirname(args.socket) or ".", mode=0o700, exist_ok=True)
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)  # stale socket from a previous run
+    try:
+        asyncio.run(serve(args.socket, args.headed))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,75 +2,244 @@
 One-time form discovery: open BELSSB meter readings page and print form structure
 (including shadow DOM) to document field names and selectors for submit_readings.py.
 Run: python discover_form.py
+
+With --capture-endpoint it also fills the form with marker values, intercepts the
+Formy submission request (it is aborted, nothing reaches BELSSB) and saves its URL,
+headers and payload schema to formy_endpoint.yaml for submit_readings.py's HTTP fast path.
 """
+import argparse
 import json
+import re
 import sys
-from playwright.sync_api import sync_playwright
+from urllib.parse import parse_qsl
+
+import yaml
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+
+from submit_readings import ENDPOINT_FILE, FORM_POLL_MS, JS_FORM_READY, URL, is_formy_frame
 
-URL = "https://www.belssb.ru/individuals/pokaz/"
+CAPTURE_TIMEOUT_MS = 15000
+
+# Marker values typed into the form; payload values equal to a marker map back to that field
+CAPTURE_VALUES = {
+    "input-account": "11111111",
+    "c_day": "222",
+    "c_night": "333",
+    "c_peak": "444",
+    "email": "capture@example.com",
+    "phone": "9000000000",
+}
+# Request headers worth replaying; the rest (cookies, lengths, client hints) are per-session
+REPLAY_HEADERS = ("content-type", "accept", "origin", "referer", "x-requested-with", "user-agent")
 
 JS_COLLECT_FORM = """
 () => {
   const result = { inputs: [], buttons: [], iframes: [], shadowHosts: [] };
-  function walk(root, depth) {
-    if (!root || depth > 20) return;
+  // Single pass per root: one TreeWalker records fields, buttons, iframes and shadow hosts,
+  // and queues each shadow root for its own pass.
+  const roots = [document];
+  for (let i = 0; i < roots.length; i++) {
     try {
-      const inputs = root.querySelectorAll('input:not([type=hidden]), select, textarea');
-      inputs.forEach(el => {
-        const label = el.labels && el.labels[0] ? el.labels[0].textContent.trim() : '';
-        const placeholder = el.placeholder || '';
-        const name = el.name || el.id || '';
-        result.inputs.push({
-          tag: el.tagName,
-          type: el.type || '',
-          name,
-          id: el.id || '',
-          placeholder: placeholder.slice(0, 80),
-          label: label.slice(0, 120),
-          required: el.required
-        });
-      });
-      root.querySelectorAll('button, [type=submit], input[type=submit]').forEach(el => {
-        result.buttons.push({
-          tag: el.tagName,
-          type: el.type || '',
-          text: (el.textContent || el.value || '').trim().slice(0, 80)
-        });
-      });
-      root.querySelectorAll('iframe').forEach(iframe => {
-        result.iframes.push({ src: iframe.src || '', id: iframe.id || '' });
-      });
-      root.querySelectorAll('*').forEach(el => {
+      const tw = document.createTreeWalker(roots[i], NodeFilter.SHOW_ELEMENT);
+      for (let el = tw.nextNode(); el; el = tw.nextNode()) {
         if (el.shadowRoot) {
           result.shadowHosts.push(el.tagName + (el.id ? '#' + el.id : ''));
-          walk(el.shadowRoot, depth + 1);
+          roots.push(el.shadowRoot);
         }
-      });
+        const tag = el.tagName;
+        const type = (el.getAttribute('type') || '').toLowerCase();
+        if ((tag === 'INPUT' && type !== 'hidden') || tag === 'SELECT' || tag === 'TEXTAREA') {
+          const label = el.labels && el.labels[0] ? el.labels[0].textContent.trim() : '';
+          const placeholder = el.placeholder || '';
+          const name = el.name || el.id || '';
+          result.inputs.push({
+            tag,
+            type: el.type || '',
+            name,
+            id: el.id || '',
+            placeholder: placeholder.slice(0, 80),
+            label: label.slice(0, 120),
+            required: el.required
+          });
+        }
+        if (tag === 'BUTTON' || type === 'submit') {
+          result.buttons.push({
+            tag,
+            type: el.type || '',
+            text: (el.textContent || el.value || '').trim().slice(0, 80)
+          });
+        } else if (tag === 'IFRAME') {
+          result.iframes.push({ src: el.src || '', id: el.id || '' });
+        }
+      }
     } catch (e) {}
   }
-  walk(document, 0);
   return result;
 }
 """
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Print the BELSSB form structure (including shadow DOM)."
+    )
+    parser.add_argument(
+        "--capture-endpoint",
+        action="store_true",
+        help="Also capture the Formy submission request (aborted, not sent) "
+        f"and save it to {ENDPOINT_FILE}.",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default=ENDPOINT_FILE,
+        help=f"Where to save the captured endpoint (default: {ENDPOINT_FILE})",
+    )
+    return parser.parse_args()
+
+
+def _parse_payload(content_type, post_data):
+    """Decode a captured request body. Returns (encoding, flat dict) or (None, None) if unsupported."""
+    if not post_data:
+        return None, None
+    if "application/x-www-form-urlencoded" in content_type:
+        return "form", dict(parse_qsl(post_data, keep_blank_values=True))
+    if "json" in content_type:
+        try:
+            data = json.loads(post_data)
+        except ValueError:
+            return None, None
+        if isinstance(data, dict) and all(not isinstance(v, (dict, list)) for v in data.values()):
+            return "json", data
+    return None, None
+
+
+def capture_endpoint(page, form_target, output):
+    """Fill form_target (page or frame) with CAPTURE_VALUES, submit, intercept the Formy POST
+    and save its schema to output. Returns 0 on success, 1 otherwise."""
+    def is_submission(request):
+        return request.method != "GET" and "formy" in request.url
+
+    def intercept(route):
+        if is_submission(route.request):
+            route.abort()  # marker values must never be submitted
+        else:
+            route.continue_()
+
+    page.route("**/*", intercept)
+    for name, value in CAPTURE_VALUES.items():
+        try:
+            form_target.locator(f'input[name="{name}"]').first.fill(value, timeout=2000)
+        except Exception as e:
+            print(f"Capture: cannot fill {name}: {e}", file=sys.stderr)
+    try:
+        form_target.locator('select[name="phoneCountry"]').first.select_option("7", timeout=2000)
+    except Exception:
+        pass
+    # The widget may not be a native <form>: click its submit button, found next to the account
+    # input the way JS_FILL_AND_SUBMIT finds it
+    submit = form_target.locator('input[name="input-account"]').first.evaluate_handle("""
+        acc => {
+            const container = acc.closest('form') || acc.closest('div') || acc.getRootNode();
+            return container.querySelector('button[type=submit]');
+        }
+    """).as_element()
+    if submit is None:
+        print("Capture: submit button not found next to the account input.", file=sys.stderr)
+        return 1
+    try:
+        with page.expect_request(is_submission, timeout=CAPTURE_TIMEOUT_MS) as request_info:
+            submit.click()
+    except PlaywrightTimeout:
+        print("Capture: no Formy submission request seen (client-side validation may have "
+              "rejected the marker values).", file=sys.stderr)
+        return 1
+    request = request_info.value
+
+    headers = request.headers
+    encoding, payload = _parse_payload(headers.get("content-type", ""), request.post_data)
+    if payload is None:
+        print(f"Capture: unsupported payload ({headers.get('content-type')}): "
+              f"{(request.post_data or '')[:300]}", file=sys.stderr)
+        return 1
+    by_marker = {value: name for name, value in CAPTURE_VALUES.items()}
+    fields, static = {}, {}
+    for key, value in payload.items():
+        if str(value) in by_marker:
+            fields[key] = by_marker[str(value)]
+        elif key.lower().startswith("phonecountry"):
+            fields[key] = "phoneCountry"
+        else:
+            static[key] = value
+    leaked = [
+        key for key, value in static.items()
+        if any(marker in str(value) or marker in re.sub(r"\D", "", str(value))
+               for marker in CAPTURE_VALUES.values())
+    ]
+    if leaked:
+        print(f"Capture: fields {leaked} carry reformatted marker values and cannot be mapped: "
+              f"{payload}", file=sys.stderr)
+        return 1
+    if "input-account" not in fields.values():
+        print(f"Capture: account marker not found in payload: {payload}", file=sys.stderr)
+        return 1
+    endpoint = {
+        "url": request.url,
+        "method": request.method,
+        "encoding": encoding,
+        "headers": {k: v for k, v in headers.items() if k.lower() in REPLAY_HEADERS},
+        "fields": fields,
+        "static": static,
+        "success_text": "",  # unknown: the request was aborted, so no response was seen
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        yaml.safe_dump(endpoint, f, allow_unicode=True, sort_keys=False)
+    print(f"Saved Formy endpoint to {output}: {request.method} {request.url}", file=sys.stderr)
+    return 0
+
+
 def main():
+    args = parse_args()
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         try:
             page = browser.new_page()
-            page.goto(URL, wait_until="networkidle", timeout=20000)
-            page.wait_for_timeout(5000)  # allow Formy widget to load
+            page.goto(URL, wait_until="domcontentloaded", timeout=20000)
+            try:  # Formy widget attached
+                page.wait_for_function(JS_FORM_READY, arg=True, polling=FORM_POLL_MS, timeout=20000)
+            except PlaywrightTimeout:
+                # A slow or changed widget is what this tool is for: print whatever is there
+                print("Form not ready within 20s, printing the current structure.", file=sys.stderr)
             data = page.evaluate(JS_COLLECT_FORM)
             print(json.dumps(data, ensure_ascii=False, indent=2))
-            # Also try within any iframe
-            for frame in page.frames:
-                if frame != page.main_frame and "formy" in (frame.url or ""):
-                    try:
-                        iframe_data = frame.evaluate(JS_COLLECT_FORM)
-                        print("\n--- Inside iframe ---\n", json.dumps(iframe_data, ensure_ascii=False, indent=2))
-                    except Exception as e:
-                        print("Frame eval error:", e)
+            form_target = page if any(i["name"] == "input-account" for i in data["inputs"]) else None
+            # Also try within any Formy iframe
+            formy_frames = [f for f in page.frames if is_formy_frame(f)]
+            if not formy_frames and form_target is None:
+                try:  # the iframe element may not have navigated to Formy yet
+                    formy_frames = [page.wait_for_event(
+                        "framenavigated", predicate=is_formy_frame, timeout=20000
+                    )]
+                except PlaywrightTimeout:
+                    print("No Formy iframe navigated within 20s.", file=sys.stderr)
+            for frame in formy_frames:
+                try:
+                    frame.wait_for_function(
+                        JS_FORM_READY, arg=True, polling=FORM_POLL_MS, timeout=20000
+                    )
+                    iframe_data = frame.evaluate(JS_COLLECT_FORM)
+                    print("\n--- Inside iframe ---\n", json.dumps(iframe_data, ensure_ascii=False, indent=2))
+                    if form_target is None and any(
+                        i["name"] == "input-account" for i in iframe_data["inputs"]
+                    ):
+                        form_target = frame
+                except Exception as e:
+                    print("Frame eval error:", e)
+            if args.capture_endpoint:
+                if form_target is None:
+                    print("Capture: account input not found, nothing to submit.", file=sys.stderr)
+                    return 1
+                return capture_endpoint(page, form_target, args.output)
         finally:
             browser.close()
     return 0
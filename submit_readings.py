@@ -8,33 +8,255 @@ Readings after the 25th of the month are not accepted for the current period.
 """
 
 import argparse
+import json
 import os
 import re
+import socket
 import sys
+import tempfile
+from datetime import date as _date
 from pathlib import Path
+from urllib.parse import urlsplit
 
-import yaml
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+# yaml, requests, asyncio and playwright are imported where used: --help and input errors
+# exit without loading them, and the HTTP fast path never loads playwright.
 
 URL = "https://www.belssb.ru/individuals/pokaz/"
 SUCCESS_TEXT = "Сообщение успешно отправлено"
 FORM_WAIT_TIMEOUT_MS = 20000
+# JS_FORM_READY walks the whole DOM; every 100 ms is enough, on every animation frame is not
+FORM_POLL_MS = 100
 SUBMIT_WAIT_TIMEOUT_MS = 15000
+MIN_FILLED_FIELDS = 2  # account + at least one reading, else the form was not found
+# Not needed to fill the form: dropped unless they come from Formy itself
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "stylesheet", "media"})
+TRACKER_HOSTS = (
+    "mc.yandex.ru", "an.yandex.ru", "top-fwz1.mail.ru", "top.mail.ru", "vk.com",
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "facebook.net",
+)
+TRACKER_HOST_RE = re.compile(r"(^|\.)(" + "|".join(map(re.escape, TRACKER_HOSTS)) + r")$")
+# Per-user location: a fixed name in the shared temp directory could be bound by another user
+DEFAULT_SOCKET_PATH = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR")
+    or os.path.join(tempfile.gettempdir(), f"belssb-{os.getuid() if hasattr(os, 'getuid') else 0}"),
+    "belssb.sock",
+)
+DAEMON_TIMEOUT_S = 120
+ENDPOINT_FILE = "formy_endpoint.yaml"
+HTTP_TIMEOUT_S = 30
+BATCH_CONCURRENCY = 8  # pages open at once in one browser
+CACHE_DIR = Path.home() / ".cache" / "belssb"  # persistent Chromium profile (HTTP cache)
+STATE_FILE = CACHE_DIR / "state.json"  # cookies/storage saved after each in-process run
+DISK_CACHE_BYTES = 50 * 1024 * 1024
+# The persistent profile is not routed: request interception turns off Chromium's HTTP cache.
+# Trackers are resolved to nowhere by the browser itself instead; the rest is served from cache.
+PROFILE_CHROMIUM_ARGS = (
+    f"--disk-cache-size={DISK_CACHE_BYTES}",
+    "--host-rules=" + ", ".join(
+        f"MAP {pattern} ~NOTFOUND" for host in TRACKER_HOSTS for pattern in (host, f"*.{host}")
+    ),
+)
+# Form fills need no GPU, extensions, sync or background services. Not --disable-features: it
+# would replace Playwright's own list. Not --single-process: Chromium does not support it.
+CHROMIUM_ARGS = (
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-translate",
+)
+# Only for a browser that fills one form: without site isolation the cross-origin Formy iframe
+# shares the page's renderer. Batch and daemon browsers keep a renderer per page to run in parallel.
+SINGLE_RUN_CHROMIUM_ARGS = (
+    "--disable-site-isolation-trials",
+    "--renderer-process-limit=1",
+)
 
 TARIFF_SINGLE = "single"
 TARIFF_TWO_ZONE = "two-zone"
 TARIFF_THREE_ZONE = "three-zone"
 TARIFFS = (TARIFF_SINGLE, TARIFF_TWO_ZONE, TARIFF_THREE_ZONE)
+WARNING_AFTER_25TH = (
+    "Warning: Readings submitted after the 25th are not accepted for the "
+    "current billing period (only for the next).\n"
+)
+
+# Reading fields with their defaults; each comes from CLI, then config, then BELSSB_<NAME> env
+READING_FIELDS = (
+    ("account", None),
+    ("tariff", TARIFF_SINGLE),
+    ("day", None),
+    ("night", ""),
+    ("peak", ""),
+    ("email", ""),
+    ("phone", ""),
+)
+
+# Meter reading: digits with an optional decimal part, "." or "," as separator
+_NUM_RE = re.compile(r"^\d+(?:[.,]\d+)?$")
+
+# Resolves to "document" once the account input is attached (shadow DOM included), with
+# acceptIframe also to "iframe" once a Formy iframe is in the page, and to false otherwise.
+JS_FORM_READY = """
+(acceptIframe) => {
+    const queue = [document];
+    for (let i = 0; i < queue.length; i++) {
+        if (queue[i].querySelector('input[name="input-account"]')) return 'document';
+        const tw = document.createTreeWalker(queue[i], NodeFilter.SHOW_ELEMENT);
+        for (let n = tw.nextNode(); n; n = tw.nextNode()) {
+            if (n.shadowRoot) queue.push(n.shadowRoot);
+        }
+    }
+    if (acceptIframe && document.querySelector("iframe[src*='formy']")) return 'iframe';
+    return false;
+}
+"""
+
+# Fill the form, click submit and resolve once the success text appears (or after timeoutMs).
+# Argument: {fields, successText, timeoutMs, minFilled}, see _fill_args.
+JS_FILL_AND_SUBMIT = """
+({ fields, successText, timeoutMs, minFilled }) => {
+    const values = new Map(Object.entries(fields));
+    const setInputValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+    const setSelectValue = Object.getOwnPropertyDescriptor(HTMLSelectElement.prototype, 'value').set;
+    function fillIn(root) {
+        const acc = root.querySelector('input[name="input-account"]') || root.getElementById('input-account');
+        if (!acc) return { filled: 0, submit: null };
+        const container = acc.closest('form') || acc.closest('div') || root;
+        const changed = [];
+        let submit = null;
+        // One query for fields and submit button, dispatched by tag
+        const list = container.querySelectorAll('input[name], input[id], select[name], button[type=submit]');
+        for (let i = 0; i < list.length; i++) {
+            const el = list[i];
+            const tag = el.tagName;
+            if (tag === 'BUTTON') {
+                if (!submit) submit = el;
+                continue;
+            }
+            const name = el.getAttribute('name');
+            const id = el.id;
+            // Values are strings already (_form_args), no coercion needed
+            let val = name !== null ? values.get(name) : undefined;
+            if (!val && id) val = values.get(id);
+            if (val) {
+                // Native setter: bypasses value interception by the widget's framework
+                (tag === 'SELECT' ? setSelectValue : setInputValue).call(el, val);
+                changed.push(el);
+            }
+        }
+        // All values are in place before the widget hears about any of them
+        for (const el of changed) {
+            el.dispatchEvent(new Event('input', { bubbles: true }));
+            if (el.tagName === 'SELECT') el.dispatchEvent(new Event('change', { bubbles: true }));
+        }
+        return { filled: changed.length, submit, root };
+    }
+    // Document first, then each shadow root (nested ones too) as the TreeWalker pass over an
+    // earlier root finds it; stops walking at the first root that holds the form
+    function* roots() {
+        const queue = [document];
+        for (let i = 0; i < queue.length; i++) {
+            yield queue[i];
+            const tw = document.createTreeWalker(queue[i], NodeFilter.SHOW_ELEMENT);
+            for (let n = tw.nextNode(); n; n = tw.nextNode()) {
+                if (n.shadowRoot) queue.push(n.shadowRoot);
+            }
+        }
+    }
+    let r = { filled: 0, submit: null };
+    for (const root of roots()) {
+        r = fillIn(root);
+        if (r.filled > 0) break;
+    }
+    if (r.filled < minFilled || !r.submit) {
+        return { filled: r.filled, submitClicked: false, ok: false, snippet: '' };
+    }
+    // Watch the form's own tree (shadow root or document) for the success message
+    const root = r.root;
+    const text = () => (root === document ? document.body.innerText : root.textContent) || '';
+    return new Promise(resolve => {
+        let timer = null;
+        const mo = new MutationObserver(() => {
+            if (text().includes(successText)) {
+                mo.disconnect();
+                clearTimeout(timer);
+                resolve({ filled: r.filled, submitClicked: true, ok: true, snippet: '' });
+            }
+        });
+        mo.observe(root, { subtree: true, childList: true, characterData: true });
+        timer = setTimeout(() => {
+            mo.disconnect();
+            resolve({ filled: r.filled, submitClicked: true, ok: false, snippet: text().slice(0, 500) });
+        }, timeoutMs);
+        r.submit.click();
+    });
+}
+"""
+
+# Look for a text in the rendered body inside the page; only the verdict and a snippet come back
+JS_BODY_HAS_TEXT = """
+(needle) => {
+    const text = document.body ? document.body.innerText : '';
+    return { ok: text.includes(needle), snippet: text.slice(0, 500) };
+}
+"""
 
 
 def load_config(config_path):
-    """Load optional YAML config. Returns dict (possibly empty)."""
+    """Load optional config: TOML (.toml) or JSON (.json) with the standard library, YAML otherwise.
+    Returns dict (possibly empty). Raises OSError if the file cannot be read, ValueError if it
+    cannot be parsed or is not a mapping."""
     path = Path(config_path)
     if not path.is_file():
         return {}
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-    return data or {}
+    suffix = path.suffix.lower()
+    if suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError as e:
+            raise ValueError("TOML configs need Python 3.11+") from e
+
+        with open(path, "rb") as f:
+            data = tomllib.load(f)  # TOMLDecodeError is a ValueError
+    elif suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)  # JSONDecodeError is a ValueError
+    else:
+        import yaml
+
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                data = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(str(e)) from e
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise ValueError("expected a mapping of settings")
+    return data
+
+
+def load_batch(batch_path):
+    """Load a YAML list of readings for --batch. Each item is a dict with the same keys as
+    the config (account, tariff, day, night, peak, email, phone). Returns list of dicts.
+    Raises OSError if the file cannot be read, ValueError if it is not such a list."""
+    import yaml
+
+    with open(batch_path, "r", encoding="utf-8") as f:
+        try:
+            data = yaml.safe_load(f)
+        except yaml.YAMLError as e:
+            raise ValueError(str(e)) from e
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise ValueError("expected a list of readings (mappings)")
+    known = {name for name, _ in READING_FIELDS}
+    for i, item in enumerate(data):
+        unknown = sorted(str(k) for k in item if k not in known)
+        if unknown:
+            raise ValueError(f"entry {i + 1}: unknown key(s) {', '.join(unknown)}")
+    return data
 
 
 def parse_args():
@@ -45,7 +267,7 @@ def parse_args():
         "--config",
         "-c",
         default="config.yaml",
-        help="Path to YAML config file (default: config.yaml)",
+        help="Path to config file: YAML, or TOML/JSON by extension (default: config.yaml)",
     )
     parser.add_argument(
         "--account",
@@ -82,11 +304,41 @@ def parse_args():
         "--phone",
         help="Phone number (e.g. 9123456789). Overrides config.",
     )
+    parser.add_argument(
+        "--batch",
+        "-b",
+        metavar="FILE",
+        help="YAML file with a list of readings to submit in one browser session. "
+        "Entry values override CLI / config / env.",
+    )
     parser.add_argument(
         "--headed",
         action="store_true",
         help="Run browser in headed mode (visible window). Use if captcha appears.",
     )
+    parser.add_argument(
+        "--socket",
+        default=os.environ.get("BELSSB_SOCKET", DEFAULT_SOCKET_PATH),
+        help="Unix socket of a running belssb_daemon.py; used if present, otherwise "
+        f"the browser is launched in-process (default: {DEFAULT_SOCKET_PATH})",
+    )
+    parser.add_argument(
+        "--cdp-url",
+        default=os.environ.get("BELSSB_CDP_URL"),
+        help="Connect to an already running Chromium (e.g. http://localhost:9222, see "
+        "belssb_browser_up.py) instead of launching one.",
+    )
+    parser.add_argument(
+        "--endpoint",
+        default=ENDPOINT_FILE,
+        help="Formy endpoint saved by discover_form.py --capture-endpoint; when present, readings "
+        f"are posted directly without a browser (default: {ENDPOINT_FILE})",
+    )
+    parser.add_argument(
+        "--force-browser",
+        action="store_true",
+        help="Always fill the form in a browser, even if the Formy endpoint file exists.",
+    )
     parser.add_argument(
         "--no-warn-date",
         action="store_true",
@@ -102,93 +354,66 @@ def parse_args():
 
 def validate_readings(tariff, day, night, peak):
     """Validate readings per tariff. Returns (True, None) or (False, error_msg)."""
-    def numeric(s):
-        if s is None:
-            return False
-        s = str(s).strip().replace(",", ".")
-        return bool(s) and (s.isdigit() or (s.replace(".", "", 1).isdigit() and "." in s))
-
-    if not day or not numeric(day):
+    if not day or not _NUM_RE.match(str(day).strip()):
         return False, "Missing or invalid --day (general/day/semi-peak reading)."
     if tariff in (TARIFF_TWO_ZONE, TARIFF_THREE_ZONE):
-        if not night or not numeric(night):
+        if not night or not _NUM_RE.match(str(night).strip()):
             return False, "Missing or invalid --night for two-zone/three-zone tariff."
     if tariff == TARIFF_THREE_ZONE:
-        if not peak or not numeric(peak):
+        if not peak or not _NUM_RE.match(str(peak).strip()):
             return False, "Missing or invalid --peak for three-zone tariff."
     return True, None
 
 
 def warn_after_25th():
     """Warn if current date is after 25th."""
-    from datetime import date
-    today = date.today()
-    if today.day > 25:
-        print(
-            "Warning: Readings submitted after the 25th are not accepted for the "
-            "current billing period (only for the next).",
-            file=sys.stderr,
-        )
+    if _date.today().day > 25:
+        sys.stderr.write(WARNING_AFTER_25TH)
 
 
-def _fill_form_via_js(eval_target, account, tariff, day, night, peak, email, phone):
-    """Fill Formy form (shadow DOM or iframe) via JavaScript. eval_target is page or frame.
-    Returns dict with filled count and submitClicked."""
+def _error_result(e):
+    """Turn an exception raised while submitting one reading into (False, message)."""
+    if type(e).__module__.startswith("playwright"):
+        from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+        if isinstance(e, PlaywrightTimeout):
+            return False, f"Timeout while loading or submitting the form. Try --headed or run again. ({e})"
+    return False, str(e)
+
+
+def _form_args(account, day, night, peak, email, phone):
+    """Map readings to Formy form field names (see FORM_STRUCTURE.md). Returns dict of str."""
     phone_digits = re.sub(r"\D", "", str(phone or ""))[-10:]
-    args = {
+    return {
         "input-account": str(account),
         "c_day": str(day),
         "c_night": str(night) if night else "",
         "c_peak": str(peak) if peak else "",
-        "email": email or "",
+        "email": str(email or ""),
         "phone": phone_digits,
         "phoneCountry": "7" if phone_digits else "",
     }
-    script = """
-    (args) => {
-        function createEvent(type) {
-            return new Event(type, { bubbles: true });
-        }
-        function findAndFill(root, depth) {
-            if (!root || depth > 25) return { filled: 0, submit: null };
-            const acc = root.querySelector('input[name="input-account"]') || root.getElementById('input-account');
-            if (acc) {
-                const container = acc.closest('form') || acc.closest('div') || root;
-                let filled = 0;
-                container.querySelectorAll('input[name], select[name], input[id]').forEach(el => {
-                    const name = el.getAttribute('name');
-                    const id = el.id || '';
-                    const val = (args[name] !== undefined ? String(args[name]) : null)
-                        || (id && args[id] !== undefined ? String(args[id]) : null);
-                    if (val !== null && val !== '') {
-                        el.value = val;
-                        el.dispatchEvent(createEvent('input'));
-                        el.dispatchEvent(createEvent('change'));
-                        filled++;
-                    }
-                });
-                const submit = container.querySelector('button[type=submit]');
-                return { filled, submit };
-            }
-            const list = root.querySelectorAll('*');
-            for (let i = 0; i < list.length; i++) {
-                const el = list[i];
-                if (el.shadowRoot) {
-                    const r = findAndFill(el.shadowRoot, depth + 1);
-                    if (r.filled > 0) return r;
-                }
-            }
-            return { filled: 0, submit: null };
-        }
-        const r = findAndFill(document, 0);
-        if (r.submit) { r.submit.click(); return { filled: r.filled, submitClicked: true }; }
-        return { filled: r.filled, submitClicked: false };
+
+
+def _fill_args(account, day, night, peak, email, phone):
+    """Build the JS_FILL_AND_SUBMIT argument once per submission; it is reused for every
+    frame the form is looked for in."""
+    return {
+        "fields": _form_args(account, day, night, peak, email, phone),
+        "successText": SUCCESS_TEXT,
+        "timeoutMs": SUBMIT_WAIT_TIMEOUT_MS,
+        "minFilled": MIN_FILLED_FIELDS,
     }
-    """
-    return eval_target.evaluate(script, args)
 
 
-def _debug_form_fields(eval_target, label, debug):
+async def _fill_form_via_js(eval_target, fill_args):
+    """Fill and submit the Formy form (shadow DOM or iframe) in one JavaScript call, then wait in
+    the page for the success text. eval_target is page or frame, fill_args from _fill_args.
+    Returns dict with filled count, submitClicked, ok (success text seen) and snippet."""
+    return await eval_target.evaluate(JS_FILL_AND_SUBMIT, fill_args)
+
+
+async def _debug_form_fields(eval_target, label, debug):
     """If debug, run JS to list input/select names in document (and shadow) and print to stderr."""
     if not debug:
         return
@@ -210,126 +435,464 @@ def _debug_form_fields(eval_target, label, debug):
     }
     """
     try:
-        found = eval_target.evaluate(script)
+        found = await eval_target.evaluate(script)
         print(f"Debug [{label}] input/select names: {found}", file=sys.stderr)
     except Exception as e:
         print(f"Debug [{label}] error: {e}", file=sys.stderr)
 
 
-def run_submit(account, tariff, day, night, peak, email, phone, headed, debug=False):
-    """Open page, fill form, submit, check success. Returns (success: bool, message: str)."""
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=not headed)
+def is_formy_frame(frame):
+    return frame.parent_frame is not None and "formy" in (frame.url or "")
+
+
+async def _wait_for_form(page):
+    """Wait until the Formy form is attached, either in the page (shadow DOM) or in a Formy iframe.
+    Returns the page and Formy frames to try filling, the one where the form showed up first leading."""
+    import asyncio
+
+    ready = await page.wait_for_function(
+        JS_FORM_READY, arg=True, polling=FORM_POLL_MS, timeout=FORM_WAIT_TIMEOUT_MS
+    )
+    if await ready.json_value() == "document":
+        return [page]
+
+    async def form_in(target):
+        await target.wait_for_function(
+            JS_FORM_READY, arg=False, polling=FORM_POLL_MS, timeout=FORM_WAIT_TIMEOUT_MS
+        )
+        return target
+
+    async def form_in_next_formy_frame():
+        frame = await page.wait_for_event(
+            "framenavigated", predicate=is_formy_frame, timeout=FORM_WAIT_TIMEOUT_MS
+        )
+        return await form_in(frame)
+
+    # A Formy iframe is in the page: race the page itself and every Formy frame, first form wins
+    frames = [f for f in page.frames if is_formy_frame(f)]
+    waits = [form_in(page), *(form_in(f) for f in frames)]
+    if not frames:
+        waits.append(form_in_next_formy_frame())  # iframe element has not navigated to Formy yet
+    pending = {asyncio.ensure_future(w) for w in waits}
+    winner = None
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and winner is None:
+                    winner = task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    targets = [*frames, page]
+    if winner is None:
+        return targets
+    return [winner, *(t for t in targets if t is not winner)]
+
+
+async def _wait_for_success(target):
+    """Wait for the success text in target (page or frame) after submit.
+    Returns (success: bool, message: str)."""
+    from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+    try:
+        await target.wait_for_selector(f"text={SUCCESS_TEXT}", timeout=SUBMIT_WAIT_TIMEOUT_MS)
+        return True, SUCCESS_TEXT
+    except PlaywrightTimeout:
+        check = await target.evaluate(JS_BODY_HAS_TEXT, SUCCESS_TEXT)
+        if check["ok"]:
+            return True, SUCCESS_TEXT
+        snippet = check["snippet"] or "No content"
+        return False, f"Success message not found. Page snippet: {snippet}"
+
+
+async def _submit_on_page(page, account, tariff, day, night, peak, email, phone, debug=False):
+    """Load the form in page, fill, submit, check success. Returns (success: bool, message: str)."""
+    from playwright.async_api import Error as PlaywrightError
+
+    await page.goto(URL, wait_until="domcontentloaded", timeout=FORM_WAIT_TIMEOUT_MS)
+    targets = await _wait_for_form(page)
+    if debug:
+        print("Debug frame URLs:", [f.url for f in page.frames], file=sys.stderr)
+        for i, target in enumerate(targets):
+            await _debug_form_fields(target, "main" if target == page else f"frame_formy_{i}", debug)
+    fill_args = _fill_args(account, day, night, peak, email, phone)
+    fill_target = page
+    # Where the form showed up first leads; the others are fallbacks
+    for target in targets:
         try:
-            page = browser.new_page()
-            page.goto(URL, wait_until="networkidle", timeout=FORM_WAIT_TIMEOUT_MS)
-            # Formy widget can load in shadow DOM or in an iframe; wait for it
-            page.wait_for_timeout(8000)
-            # Wait for Formy iframe to appear (up to 12s)
-            for _ in range(12):
-                formy_frames = [f for f in page.frames if f != page.main_frame and "formy" in (f.url or "")]
-                if formy_frames:
-                    break
-                page.wait_for_timeout(1000)
+            result = await _fill_form_via_js(target, fill_args)
+        except PlaywrightError as e:
+            if "Execution context was destroyed" not in str(e):
+                raise
+            # Submitting navigated the frame away before the in-page wait could report
             if debug:
-                print("Debug frame URLs:", [f.url for f in page.frames], file=sys.stderr)
-                _debug_form_fields(page, "main", debug)
-                for i, f in enumerate(formy_frames):
-                    _debug_form_fields(f, f"frame_formy_{i}", debug)
-            result = None
-            fill_target = page
-            # Try Formy iframe(s) first (form is often only there)
-            for frame in formy_frames:
-                result = _fill_form_via_js(
-                    frame, account, tariff, day, night, peak, email, phone
-                )
-                if debug:
-                    print(f"Debug fill in formy frame: filled={result.get('filled', 0)}, submitClicked={result.get('submitClicked')}", file=sys.stderr)
-                if result.get("filled", 0) >= 2:
-                    fill_target = frame
-                    break
-            if result is None or result.get("filled", 0) < 2:
-                result = _fill_form_via_js(
-                    page, account, tariff, day, night, peak, email, phone
+                print(f"Debug fill navigated away: {e}", file=sys.stderr)
+            if target != page and target.is_detached():
+                target = page
+            return await _wait_for_success(target)
+        if debug:
+            label = "main page" if target == page else "formy frame"
+            print(f"Debug fill in {label}: filled={result.get('filled', 0)}, submitClicked={result.get('submitClicked')}, ok={result.get('ok')}", file=sys.stderr)
+        if result.get("filled", 0) >= MIN_FILLED_FIELDS:
+            fill_target = target
+            break
+    if result.get("filled", 0) < MIN_FILLED_FIELDS:
+        return False, "Could not find form fields (form may have changed or not loaded)."
+    if result.get("ok"):
+        return True, SUCCESS_TEXT
+    if result.get("submitClicked"):
+        # The in-page wait only watches the form's own tree; the message may be in a nested shadow root
+        if await fill_target.locator(f"text={SUCCESS_TEXT}").count():
+            return True, SUCCESS_TEXT
+        snippet = result.get("snippet") or "No content"
+        return False, f"Success message not found. Page snippet: {snippet}"
+    try:
+        if fill_target == page:
+            await page.locator("button[type=submit]").nth(1).click(timeout=5000)
+        else:
+            await fill_target.locator("button[type=submit]").first.click(timeout=5000)
+    except Exception:
+        return False, "Could not find or click submit button."
+    return await _wait_for_success(fill_target)
+
+
+async def _block_heavy_resources(route):
+    """Route handler: abort images, fonts, stylesheets, media and trackers; keep Formy's own."""
+    request = route.request
+    url = request.url
+    if "formy" not in url and (
+        request.resource_type in BLOCKED_RESOURCE_TYPES
+        or TRACKER_HOST_RE.search(urlsplit(url).hostname or "")
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def _saved_state():
+    """Cookies/storage saved by the last persistent-profile run, or None if missing or unreadable."""
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) else None
+
+
+async def submit_with_browser(
+    browser, account, tariff, day, night, peak, email, phone, debug=False, storage_state=None
+):
+    """Submit in a fresh context of an already running browser; only the context is closed.
+    storage_state (dict, see _saved_state) seeds the context's cookies/storage.
+    Returns (success: bool, message: str)."""
+    context = await browser.new_context(storage_state=storage_state)
+    try:
+        await context.route("**/*", _block_heavy_resources)
+        page = await context.new_page()
+        return await _submit_on_page(page, account, tariff, day, night, peak, email, phone, debug)
+    finally:
+        await context.close()
+
+
+async def _open_browser(p, headed, cdp_url=None, single=False):
+    """Connect to the already running browser at cdp_url if given (closing it then only
+    disconnects), otherwise launch one; single launches it for just one form."""
+    if cdp_url:
+        return await p.chromium.connect_over_cdp(cdp_url)
+    args = [*CHROMIUM_ARGS, *SINGLE_RUN_CHROMIUM_ARGS] if single else list(CHROMIUM_ARGS)
+    return await p.chromium.launch(headless=not headed, args=args)
+
+
+async def run_submit_async(account, tariff, day, night, peak, email, phone, headed, debug=False, cdp_url=None):
+    """Submit once. With cdp_url, in a fresh context of that running browser. Otherwise launch a
+    browser on the persistent profile in CACHE_DIR (HTTP and V8 code cache survive between runs),
+    falling back to a throwaway browser if the profile is in use by another run.
+    Returns (success: bool, message: str)."""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        context = None
+        if not cdp_url:
+            try:
+                context = await p.chromium.launch_persistent_context(
+                    str(CACHE_DIR),
+                    headless=not headed,
+                    args=[*CHROMIUM_ARGS, *SINGLE_RUN_CHROMIUM_ARGS, *PROFILE_CHROMIUM_ARGS],
                 )
+            except Exception as e:
                 if debug:
-                    print(f"Debug fill in main page: filled={result.get('filled', 0)}, submitClicked={result.get('submitClicked')}", file=sys.stderr)
-                if result.get("filled", 0) >= 2:
-                    fill_target = page
-            if result.get("filled", 0) < 2:
-                return False, "Could not find form fields (form may have changed or not loaded)."
-            if not result.get("submitClicked"):
-                try:
-                    if fill_target == page:
-                        page.locator("button[type=submit]").nth(1).click(timeout=5000)
-                    else:
-                        fill_target.locator("button[type=submit]").first.click(timeout=5000)
-                except Exception:
-                    return False, "Could not find or click submit button."
+                    print(f"Debug persistent profile unavailable, using a fresh browser: {e}", file=sys.stderr)
+        if context is None:
+            browser = await _open_browser(p, headed, cdp_url, single=True)
             try:
-                fill_target.wait_for_selector(
-                    f"text={SUCCESS_TEXT}",
-                    timeout=SUBMIT_WAIT_TIMEOUT_MS,
+                return await submit_with_browser(
+                    browser, account, tariff, day, night, peak, email, phone, debug,
+                    storage_state=None if cdp_url else _saved_state(),
                 )
-                return True, SUCCESS_TEXT
-            except PlaywrightTimeout:
-                body = fill_target.locator("body").inner_text()
-                if SUCCESS_TEXT in body:
-                    return True, SUCCESS_TEXT
-                snippet = body[:500] if body else "No content"
-                return False, f"Success message not found. Page snippet: {snippet}"
+            finally:
+                await browser.close()
+        try:
+            page = context.pages[0] if context.pages else await context.new_page()
+            return await _submit_on_page(page, account, tariff, day, night, peak, email, phone, debug)
+        finally:
+            try:
+                await context.storage_state(path=str(STATE_FILE))
+            except Exception:
+                pass  # the saved state is only a warm start for later in-process contexts
+            await context.close()
+
+
+def run_submit(account, tariff, day, night, peak, email, phone, headed, debug=False, cdp_url=None):
+    """Blocking wrapper around run_submit_async. Returns (success: bool, message: str)."""
+    import asyncio
+
+    return asyncio.run(
+        run_submit_async(account, tariff, day, night, peak, email, phone, headed, debug, cdp_url)
+    )
+
+
+async def run_batch_async(readings, headed, cdp_url=None):
+    """Submit several readings (dicts of run_submit keyword args, without headed) with one browser
+    (launched, or the one at cdp_url), each in its own context, up to BATCH_CONCURRENCY at a time.
+    A failed reading does not stop the rest. Returns a list of (success: bool, message: str) in
+    the same order."""
+    import asyncio
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    state = None if cdp_url else _saved_state()
+
+    async def submit_one(browser, reading):
+        async with semaphore:
+            try:
+                return await submit_with_browser(browser, **reading, storage_state=state)
+            except PlaywrightTimeout as e:
+                return False, f"Timeout while loading or submitting the form. ({e})"
+            except Exception as e:
+                return False, str(e)
+
+    async with async_playwright() as p:
+        browser = await _open_browser(p, headed, cdp_url)
+        try:
+            return await asyncio.gather(*(submit_one(browser, r) for r in readings))
         finally:
-            browser.close()
+            await browser.close()
+
+
+def run_batch(readings, headed, cdp_url=None):
+    """Blocking wrapper around run_batch_async. Returns a list of (success: bool, message: str)."""
+    import asyncio
+
+    return asyncio.run(run_batch_async(readings, headed, cdp_url))
+
+
+def load_endpoint(endpoint_path):
+    """Load the Formy endpoint captured by discover_form.py --capture-endpoint.
+    Returns dict, or None if the file is missing or not a usable schema."""
+    path = Path(endpoint_path)
+    if not path.is_file():
+        return None
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    if not isinstance(data, dict) or not data.get("url") or not isinstance(data.get("fields"), dict):
+        return None
+    return data
+
+
+def submit_via_http(endpoint, account, tariff, day, night, peak, email, phone, debug=False):
+    """Post the reading straight to the Formy endpoint, without a browser.
+    Returns (success: bool, message: str), or None if the browser should be used instead:
+    the schema does not match our fields, the server could not be reached, or it refused the
+    request. Success is a 2xx status, plus the endpoint's success_text in the response body if
+    the user has set one: the capture aborts the request and never sees a real response."""
+    import requests
+    from urllib3.exceptions import NewConnectionError
+
+    args = _form_args(account, day, night, peak, email, phone)
+    fields = endpoint["fields"]
+    if "input-account" not in fields.values() or not set(fields.values()) <= set(args):
+        return None
+    encoding = endpoint.get("encoding", "form")
+    if encoding not in ("form", "json"):
+        return None
+    payload = dict(endpoint.get("static") or {})
+    payload.update({key: args[name] for key, name in fields.items()})
+    body = {"json": payload} if encoding == "json" else {"data": payload}
+    if debug:
+        print(f"Debug HTTP {endpoint.get('method', 'POST')} {endpoint['url']}: {payload}", file=sys.stderr)
+    try:
+        response = requests.request(
+            endpoint.get("method", "POST"),
+            endpoint["url"],
+            headers=endpoint.get("headers") or {},
+            timeout=HTTP_TIMEOUT_S,
+            **body,
+        )
+    except requests.ConnectTimeout:
+        return None  # never connected, safe to retry in the browser
+    except requests.ConnectionError as e:
+        # Only a failed connect (DNS, refused) is safe to retry; a connection dropped after
+        # the request was sent may still have delivered the reading
+        if isinstance(getattr(e.args[0] if e.args else None, "reason", None), NewConnectionError):
+            return None
+        return False, f"Connection to Formy lost; the reading may have been accepted, check before resubmitting. ({e})"
+    except requests.RequestException as e:
+        return False, f"No response from Formy; the reading may have been accepted, check before resubmitting. ({e})"
+    if debug:
+        print(f"Debug HTTP status {response.status_code}: {response.text[:500]}", file=sys.stderr)
+    if response.status_code >= 400:
+        return None
+    success_text = endpoint.get("success_text")
+    if not success_text:
+        return True, f"Accepted by Formy (HTTP {response.status_code})."
+    if success_text in response.text:
+        return True, SUCCESS_TEXT
+    # Accepted by the server but not confirmed: do not resubmit through the browser
+    return False, (
+        f"Formy answered HTTP {response.status_code} without the success text; the reading may have "
+        f"been accepted, check before resubmitting. Response snippet: {response.text[:500]}"
+    )
+
+
+def submit_via_daemon(socket_path, reading):
+    """Send reading (dict of run_submit keyword args, without headed) to a running belssb_daemon.py.
+    Returns (success: bool, message: str), or None if no daemon is listening on socket_path."""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    if os.stat(socket_path).st_uid != os.getuid():
+        # Someone else's socket would receive the account and contact data
+        raise RuntimeError(f"Daemon socket {socket_path} is not owned by the current user.")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return None  # stale socket file left by a daemon that is gone
+        sock.settimeout(DAEMON_TIMEOUT_S)
+        sock.sendall(json.dumps(reading, ensure_ascii=False).encode("utf-8") + b"\n")
+        # From here on the daemon has the reading and goes on submitting it whatever happens here
+        try:
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        except socket.timeout:
+            return False, (
+                f"No response from the daemon within {DAEMON_TIMEOUT_S}s; the reading may have been "
+                "accepted, check before resubmitting."
+            )
+    if not line:
+        return False, (
+            "Daemon closed the connection without a response; the reading may have been accepted, "
+            "check before resubmitting."
+        )
+    response = json.loads(line)
+    return bool(response.get("success")), response.get("message", "")
 
 
 def main():
     args = parse_args()
-    config = load_config(args.config)
-
-    account = args.account or config.get("account") or os.environ.get("BELSSB_ACCOUNT")
-    tariff = args.tariff or config.get("tariff") or os.environ.get("BELSSB_TARIFF") or TARIFF_SINGLE
-    day = args.day or config.get("day") or os.environ.get("BELSSB_DAY")
-    night = args.night or config.get("night") or os.environ.get("BELSSB_NIGHT")
-    peak = args.peak or config.get("peak") or os.environ.get("BELSSB_PEAK")
-    email = args.email or config.get("email") or os.environ.get("BELSSB_EMAIL") or ""
-    phone = args.phone or config.get("phone") or os.environ.get("BELSSB_PHONE") or ""
-
-    if not account:
-        print("Error: Account number is required (--account or config.account).", file=sys.stderr)
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot load config file {args.config}: {e}", file=sys.stderr)
         return 2
 
-    ok, err = validate_readings(tariff, day, night, peak)
-    if not ok:
-        print(f"Error: {err}", file=sys.stderr)
-        return 2
+    env = os.environ
+    base = {
+        name: getattr(args, name) or config.get(name) or env.get(f"BELSSB_{name.upper()}") or default
+        for name, default in READING_FIELDS
+    }
+    if args.batch:
+        try:
+            entries = load_batch(args.batch)
+        except (OSError, ValueError) as e:
+            print(f"Error: Cannot load batch file {args.batch}: {e}", file=sys.stderr)
+            return 2
+        # Each entry overrides the values resolved from CLI / config / env
+        readings = [
+            {**base, **{k: v for k, v in entry.items() if k in base and v not in (None, "")}}
+            for entry in entries
+        ]
+    else:
+        readings = [base]
+
+    for i, reading in enumerate(readings):
+        where = f" (batch entry {i + 1})" if args.batch else ""
+        if not reading["account"]:
+            print(f"Error: Account number is required (--account or config.account){where}.", file=sys.stderr)
+            return 2
+        if reading["tariff"] not in TARIFFS:
+            print(f"Error: Unknown tariff {reading['tariff']!r}, expected one of {', '.join(TARIFFS)}{where}.", file=sys.stderr)
+            return 2
+        ok, err = validate_readings(reading["tariff"], reading["day"], reading["night"], reading["peak"])
+        if not ok:
+            print(f"Error: {err}{where}", file=sys.stderr)
+            return 2
+        reading["debug"] = args.debug
 
     if not args.no_warn_date:
         warn_after_25th()
 
-    try:
-        success, message = run_submit(
-            account=account,
-            tariff=tariff,
-            day=day,
-            night=night or "",
-            peak=peak or "",
-            email=email,
-            phone=phone,
-            headed=args.headed,
-            debug=args.debug,
-        )
-    except PlaywrightTimeout as e:
-        print(f"Error: Timeout while loading or submitting the form. Try --headed or run again. ({e})", file=sys.stderr)
-        return 1
-    except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
-        return 1
-
-    if success:
-        print(message)
-        return 0
-    print(f"Error: {message}", file=sys.stderr)
-    return 1
+    # Every reading gets its own result: one failure must not discard the others
+    results = [None] * len(readings)
+    # A headed run is for solving a captcha in a visible browser: browser only, no daemon
+    if not (args.force_browser or args.headed):
+        try:
+            endpoint = load_endpoint(args.endpoint)
+        except Exception as e:
+            print(f"Warning: Cannot load endpoint {args.endpoint}, using the browser: {e}", file=sys.stderr)
+            endpoint = None
+        if endpoint is not None:
+            for i, reading in enumerate(readings):
+                try:
+                    results[i] = submit_via_http(endpoint, **reading)
+                except Exception as e:
+                    results[i] = _error_result(e)
+    pending = [i for i, result in enumerate(results) if result is None]
+    # An explicit --cdp-url names the browser to use, so the daemon is skipped as well
+    if not (args.headed or args.cdp_url) and pending:
+        from concurrent.futures import ThreadPoolExecutor
+
+        def via_daemon(i):
+            try:
+                return submit_via_daemon(args.socket, readings[i])
+            except Exception as e:
+                return _error_result(e)
+
+        # One connection per reading; the daemon fills up to BATCH_CONCURRENCY of them at once
+        with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as pool:
+            for i, result in zip(pending, pool.map(via_daemon, pending)):
+                results[i] = result
+        pending = [i for i in pending if results[i] is None]
+    if len(pending) == 1 and not args.batch:
+        try:
+            results[pending[0]] = run_submit(
+                headed=args.headed, cdp_url=args.cdp_url, **readings[pending[0]]
+            )
+        except Exception as e:
+            results[pending[0]] = _error_result(e)
+    elif pending:
+        try:
+            batch_results = run_batch(
+                [readings[i] for i in pending], headed=args.headed, cdp_url=args.cdp_url
+            )
+        except Exception as e:
+            # The browser itself failed (not installed, CDP unreachable): every pending reading failed
+            batch_results = [_error_result(e)] * len(pending)
+        for i, result in zip(pending, batch_results):
+            results[i] = result
+
+    failed = 0
+    for reading, (success, message) in zip(readings, results):
+        prefix = f"{reading['account']}: " if args.batch else ""
+        if success:
+            print(f"{prefix}{message}")
+        else:
+            failed += 1
+            print(f"Error: {prefix}{message}", file=sys.stderr)
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":